@@ -3,6 +3,7 @@
 
 import os
 import uuid
+import jsonschema
 import pytest
 
 from zhmc_log_forwarder import zhmc_log_forwarder
@@ -77,3 +78,34 @@ def test_config_load(desc, config_file, exp_parms, exp_exc):
             assert config.parms == exp_parms
     finally:
         os.remove(config_filename)
+
+
+def test_extend_with_default_cached():
+    """Tests that the extended validator class is created only once."""
+
+    validator_class = jsonschema.Draft7Validator
+
+    cls1 = zhmc_log_forwarder.extend_with_default(validator_class)
+    cls2 = zhmc_log_forwarder.extend_with_default(validator_class)
+
+    assert cls1 is cls2
+    assert cls1 is not validator_class
+
+
+def test_config_load_invalid_yaml():
+    """Tests that a config file with invalid YAML is reported with its
+    file path."""
+
+    config_filename = "{}_{}.yaml".format(TEST_PREFIX, uuid.uuid4().hex)
+    with open(config_filename, "w+", encoding='utf-8') as cf:
+        cf.write("hmc_host: 10.11.12.13\nhmc_user: [user1\n")
+
+    try:
+        config = zhmc_log_forwarder.Config()
+        with pytest.raises(zhmc_log_forwarder.UserError) as exc_info:
+
+            config.load_config_file(config_filename)
+
+        assert config_filename in str(exc_info.value)
+    finally:
+        os.remove(config_filename)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+"""Unit tests for format string functions in zhmc_log_forwarder"""
+
+import pytest
+
+from zhmc_log_forwarder import zhmc_log_forwarder
+
+# Field values used for formatting
+FIELD_VALUES = {
+    'time': '2019-08-09T12:46:38.550000+02:00',
+    'label': 'myhmc',
+    'log': 'security',
+    'name': 'Logon',
+    'id': '1408',
+    'user': 'user1',
+    'msg': "User user1 has logged on from location 'the console'",
+    'var_values': ['user1', None, 42, 'the console'],
+    'var_types': ['string', None, 'long', 'string'],
+}
+
+
+TESTCASES_COMPILE_FORMAT = [
+    #
+    # desc (str): Testcase description
+    # format_str (str): Format string to be compiled.
+    # exp_compiled (bool): Expected to be compiled (vs. falling back to
+    #   str.format).
+    (
+        "Default line format",
+        "{time:32} {label} {log:8} {name:12} {id:>4} {user:20} {msg}",
+        True
+    ),
+    (
+        "Only literal text, with quotes and backslashes",
+        "it's a \"test\" \\ {{braces}}",
+        True
+    ),
+    (
+        "Conversions and item and attribute access",
+        "{var_values[2]!r:>6} {var_types[0]!s} {var_values!a} "
+        "{msg.__class__.__name__}",
+        True
+    ),
+    (
+        "Format spec with fill character",
+        "{id:*^10} {var_values[2]:08.3f}",
+        True
+    ),
+    (
+        "Nested replacement field in format spec",
+        "{msg:{id}}",
+        False
+    ),
+    (
+        "Unknown field",
+        "{foo}",
+        False
+    ),
+    (
+        "Positional field",
+        "{} {0}",
+        False
+    ),
+    (
+        "Unmatched brace",
+        "{time",
+        False
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, format_str, exp_compiled", TESTCASES_COMPILE_FORMAT
+)
+def test_compile_format(desc, format_str, exp_compiled):
+    # pylint: disable=unused-argument
+    """Tests that compiled format strings format like str.format()."""
+
+    field_names = zhmc_log_forwarder.LINE_FORMAT_FIELDS
+
+    func = zhmc_log_forwarder.compile_format(format_str, field_names)
+
+    if exp_compiled:
+        assert func.__name__ == '<lambda>'
+        assert func(**FIELD_VALUES) == format_str.format(**FIELD_VALUES)
+    else:
+        assert func.__name__ == 'format'
+
+
+TESTCASES_FORMAT_FIELD_NAMES = [
+    #
+    # desc (str): Testcase description
+    # format_str (str): Format string to be inspected.
+    # exp_names (list): Expected field names, if success.
+    # exp_exc (exc class): Expected exception class, if failure.
+    (
+        "Default line format",
+        "{time:32} {label} {log:8} {name:12} {id:>4} {user:20} {msg}",
+        ['time', 'label', 'log', 'name', 'id', 'user', 'msg'],
+        None
+    ),
+    (
+        "Item and attribute access",
+        "{var_values[0]} {msg.upper}",
+        ['var_values', 'msg'],
+        None
+    ),
+    (
+        "Nested replacement field in format spec",
+        "{msg:{id}}",
+        ['msg', 'id'],
+        None
+    ),
+    (
+        "Positional fields",
+        "{} {0}",
+        ['', '0'],
+        None
+    ),
+    (
+        "Unmatched brace",
+        "{time",
+        None,
+        ValueError
+    ),
+    (
+        "Valid conversions",
+        "{time!r} {label!s} {msg!a}",
+        ['time', 'label', 'msg'],
+        None
+    ),
+    (
+        "Unknown conversion",
+        "{cadf!x}",
+        None,
+        ValueError
+    ),
+    (
+        "Empty attribute",
+        "{time.}",
+        None,
+        ValueError
+    ),
+    (
+        "Empty item",
+        "{var_values[]}",
+        None,
+        ValueError
+    ),
+    (
+        "Text after item",
+        "{var_values[0]x}",
+        None,
+        ValueError
+    ),
+    (
+        "Positional field with item access",
+        "{0[1]}",
+        ['0'],
+        None
+    ),
+    (
+        "Malformed field name",
+        "{foo-bar}",
+        None,
+        ValueError
+    ),
+    (
+        "Unknown conversion in nested field",
+        "{msg:{id!x}}",
+        None,
+        ValueError
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, format_str, exp_names, exp_exc", TESTCASES_FORMAT_FIELD_NAMES
+)
+def test_format_field_names(desc, format_str, exp_names, exp_exc):
+    # pylint: disable=unused-argument
+    """Tests that the field names of a format string are returned."""
+
+    if exp_exc:
+        with pytest.raises(exp_exc):
+
+            zhmc_log_forwarder.format_field_names(format_str)
+
+    else:
+
+        names = zhmc_log_forwarder.format_field_names(format_str)
+
+        assert names == exp_names
+
+
+def test_compile_format_default():
+    """Tests that the default line format is compiled."""
+
+    props = zhmc_log_forwarder.CONFIG_FILE_SCHEMA['properties']
+    fwd_props = props['forwardings']['items']['properties']
+    format_str = fwd_props['line_format']['default']
+    field_names = zhmc_log_forwarder.LINE_FORMAT_FIELDS
+
+    func = zhmc_log_forwarder.compile_format(format_str, field_names)
+
+    assert func.__name__ == '<lambda>'
+    assert func(**FIELD_VALUES) == format_str.format(**FIELD_VALUES)
+
+
+def test_compile_format_non_decimal_key():
+    """Tests that digit item keys that are not decimal are string keys."""
+
+    format_str = "{var_values[²]}"
+    field_names = zhmc_log_forwarder.LINE_FORMAT_FIELDS
+
+    func = zhmc_log_forwarder.compile_format(format_str, field_names)
+
+    assert func.__name__ == '<lambda>'
+    with pytest.raises(TypeError):
+        format_str.format(**FIELD_VALUES)
+    with pytest.raises(TypeError):
+        func(**FIELD_VALUES)
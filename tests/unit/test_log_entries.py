@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""Unit tests for retrieving log entries in zhmc_log_forwarder"""
+
+import threading
+
+import pytest
+
+from zhmc_log_forwarder import zhmc_log_forwarder
+
+
+class FakeConsole:
+    # pylint: disable=too-few-public-methods
+    """
+    Console with audit and security logs, returning copies of the log
+    entries with the specified event times.
+    """
+
+    def __init__(self, audit_times, security_times):
+        self.audit_times = audit_times
+        self.security_times = security_times
+        self.thread_names = set()
+
+    def _log(self, times):
+        self.thread_names.add(threading.current_thread().name)
+        return [{'event-time': t} for t in times]
+
+    def get_audit_log(self, begin_time, end_time):
+        # pylint: disable=unused-argument
+        """Return the audit log entries."""
+        return self._log(self.audit_times)
+
+    def get_security_log(self, begin_time, end_time):
+        # pylint: disable=unused-argument
+        """Return the security log entries."""
+        return self._log(self.security_times)
+
+
+TESTCASES_GET_LOG_ENTRIES = [
+    #
+    # desc (str): Testcase description
+    # logs (list): Log types to be retrieved.
+    # audit_times (list): Event times of the audit log entries.
+    # security_times (list): Event times of the security log entries.
+    # exp_entries (list): Expected (event time, log type) of the returned
+    #   log entries.
+    (
+        "No logs",
+        [],
+        [1, 2],
+        [3],
+        []
+    ),
+    (
+        "Only audit log",
+        ['audit'],
+        [1, 2],
+        [3],
+        [(1, 'audit'), (2, 'audit')]
+    ),
+    (
+        "Only security log",
+        ['security'],
+        [1, 2],
+        [3],
+        [(3, 'security')]
+    ),
+    (
+        "Both logs, interleaved and with equal times",
+        ['audit', 'security'],
+        [1, 3, 5],
+        [2, 3, 6],
+        [(1, 'audit'), (2, 'security'), (3, 'audit'), (3, 'security'),
+         (5, 'audit'), (6, 'security')]
+    ),
+    (
+        "Both logs, security log empty",
+        ['audit', 'security'],
+        [1, 3],
+        [],
+        [(1, 'audit'), (3, 'audit')]
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, logs, audit_times, security_times, exp_entries",
+    TESTCASES_GET_LOG_ENTRIES
+)
+def test_get_log_entries(desc, logs, audit_times, security_times,
+                         exp_entries):
+    # pylint: disable=unused-argument
+    """Tests that log entries are tagged and merged by time."""
+
+    console = FakeConsole(audit_times, security_times)
+
+    entries = zhmc_log_forwarder.get_log_entries(logs, console, None, None)
+
+    assert isinstance(entries, list)
+    result = [(e['event-time'], e['log-type']) for e in entries]
+    assert result == exp_entries
+
+
+def test_get_log_entries_concurrent():
+    """Tests that both logs are retrieved in worker threads."""
+
+    console = FakeConsole([1], [2])
+
+    zhmc_log_forwarder.get_log_entries(
+        ['audit', 'security'], console, None, None)
+
+    assert threading.current_thread().name not in console.thread_names
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+"""Unit tests for zhmc_log_forwarder.OutputHandler class"""
+
+import os
+import json
+
+import pytest
+import zhmcclient.mock
+
+from zhmc_log_forwarder import zhmc_log_forwarder
+
+CONFIG_PARMS = {
+    'label': 'mylabel',
+}
+
+FWD_PARMS = {
+    'name': 'fwd1',
+    'logs': ['audit', 'security'],
+    'dest': 'stdout',
+    'syslog_host': None,
+    'syslog_port': 514,
+    'syslog_porttype': 'tcp',
+    'syslog_facility': 'user',
+    'format': 'line',
+    'line_format': '{log} {id} {msg}',
+    'time_format': 'iso8601',
+}
+
+
+def get_console():
+    """Return a console of a faked HMC."""
+    session = zhmcclient.mock.FakedSession(
+        'fake-host', 'fake-hmc', '2.14.1', '1.8')
+    session.hmc.consoles.add({'object-id': None, 'name': 'HMC1'})
+    client = zhmcclient.Client(session)
+    return client.consoles.console
+
+
+def log_entry(log_type, event_time, event_id, msg, var_values=()):
+    """Return an HMC log entry."""
+    return {
+        'log-type': log_type,
+        'event-time': event_time,
+        'event-name': 'name',
+        'event-id': event_id,
+        'userid': 'user1',
+        'user-uri': '/api/users/1',
+        'event-message': msg,
+        'event-data-items': [
+            {'data-item-number': i, 'data-item-value': value,
+             'data-item-type': 'string'}
+            for i, value in enumerate(var_values)],
+    }
+
+
+def test_output_entries_dedup(capsys):
+    """Tests that log entries that were already output are skipped."""
+
+    console = get_console()
+    handler = zhmc_log_forwarder.OutputHandler(
+        CONFIG_PARMS, None, FWD_PARMS)
+    entries1 = [
+        log_entry('audit', 1000, '1408', 'msg1'),
+        log_entry('security', 1000, '1408', 'msg1'),
+        log_entry('audit', 2000, '1408', 'msg1'),
+    ]
+    entries2 = [
+        log_entry('audit', 2000, '1408', 'msg1'),
+        log_entry('audit', 2000, '1408', 'msg2'),
+    ]
+
+    handler.output_entries(entries1, console)
+    out, _ = capsys.readouterr()
+
+    # Same event ID does not make log entries duplicates
+    assert out == "audit 1408 msg1\nsecurity 1408 msg1\naudit 1408 msg1\n"
+
+    handler.output_entries(entries2, console)
+    out, _ = capsys.readouterr()
+
+    assert out == "audit 1408 msg2\n"
+
+
+def test_output_entries_dedup_same_batch(capsys):
+    """Tests that identical log entries within one call are all output."""
+
+    console = get_console()
+    handler = zhmc_log_forwarder.OutputHandler(
+        CONFIG_PARMS, None, FWD_PARMS)
+    entries = [
+        log_entry('audit', 1000, '1408', 'msg1'),
+        log_entry('audit', 1000, '1408', 'msg1'),
+    ]
+
+    handler.output_entries(entries, console)
+    out, _ = capsys.readouterr()
+
+    assert out == "audit 1408 msg1\naudit 1408 msg1\n"
+
+    # Both are skipped in a later call
+    handler.output_entries(entries, console)
+    out, _ = capsys.readouterr()
+
+    assert out == ""
+
+
+def test_output_entries_dedup_size(capsys, monkeypatch):
+    """Tests that the remembered log entries are bounded."""
+
+    monkeypatch.setattr(zhmc_log_forwarder, 'OUTPUT_DEDUP_CACHE_SIZE', 2)
+    console = get_console()
+    handler = zhmc_log_forwarder.OutputHandler(
+        CONFIG_PARMS, None, FWD_PARMS)
+    entries = [
+        log_entry('audit', 1000, '1408', 'msg1'),
+        log_entry('audit', 2000, '1408', 'msg2'),
+        log_entry('audit', 3000, '1408', 'msg3'),
+    ]
+
+    handler.output_entries(entries, console)
+    capsys.readouterr()
+
+    assert len(handler.output_keys) == 2
+
+    # The oldest log entry is no longer remembered
+    handler.output_entries(entries, console)
+    out, _ = capsys.readouterr()
+
+    assert out == "audit 1408 msg1\n"
+
+
+def get_log_message_config():
+    """Return the HMC log message config from the shipped message file."""
+    my_dir = os.path.dirname(zhmc_log_forwarder.__file__)
+    log_message_config = zhmc_log_forwarder.LogMessageConfig()
+    log_message_config.load_message_file(
+        os.path.join(my_dir, 'zhmc_log_messages.yml'))
+    return log_message_config
+
+
+@pytest.mark.parametrize(
+    "location, exp_address", [
+        ('the console', 'console'),
+        ('an unknown location', 'unknown'),
+        ('an unknown console', 'console'),
+        ('10.11.12.13', '10.11.12.13'),
+    ]
+)
+def test_output_cadf_initiator_address(
+        capsys, location, exp_address):
+    """Tests the initiator address in the CADF output format."""
+
+    console = get_console()
+    fwd_parms = dict(FWD_PARMS, format='cadf', line_format='{cadf}')
+    handler = zhmc_log_forwarder.OutputHandler(
+        CONFIG_PARMS, get_log_message_config(), fwd_parms)
+    # Message 1408 has the location as substitution variable 3
+    entries = [
+        log_entry('security', 1000, '1408', 'msg1',
+                  ['user1', 'logged on', None, location]),
+    ]
+
+    handler.output_entries(entries, console)
+    out, _ = capsys.readouterr()
+
+    cadf = json.loads(out)
+    assert cadf['initiator']['address'] == exp_address
+
+
+def test_output_entries_cadf_only_unknown(capsys, monkeypatch):
+    """Tests that DEBUG_CADF_ONLY_UNKNOWN outputs only unknown actions."""
+
+    monkeypatch.setattr(zhmc_log_forwarder, 'DEBUG_CADF_ONLY_UNKNOWN', True)
+    console = get_console()
+    fwd_parms = dict(FWD_PARMS, format='cadf', line_format='{cadf}')
+    handler = zhmc_log_forwarder.OutputHandler(
+        CONFIG_PARMS, get_log_message_config(), fwd_parms)
+    entries = [
+        # Message in the message file with a known action
+        log_entry('security', 1000, '1408', 'msg1'),
+        # Message in the message file with action 'unknown'
+        log_entry('audit', 2000, '864', 'msg2'),
+        # Message not in the message file
+        log_entry('audit', 3000, '99999', 'msg3'),
+    ]
+
+    handler.output_entries(entries, console)
+    out, _ = capsys.readouterr()
+
+    numbers = [json.loads(line)['x_message']['number']
+               for line in out.splitlines()]
+    assert numbers == ['864', '99999']
+
+
+def test_output_handler_syslog_no_header():
+    """Tests that no table header is formatted for syslog destinations."""
+
+    # The table header values are too short for this format
+    fwd_parms = dict(FWD_PARMS, dest='syslog',
+                     line_format='{var_values[10]} {msg}')
+
+    handler = zhmc_log_forwarder.OutputHandler(
+        CONFIG_PARMS, None, fwd_parms)
+
+    assert handler.header_str is None
+    assert handler.trailer_str is None
+
+
+@pytest.mark.parametrize(
+    "fwd_format, line_format", [
+        ('cadf', '{time} {cadf!x}'),
+        ('line', '{time.} {msg}'),
+        ('line', '{var_values[]} {msg}'),
+        ('line', '{foo} {msg}'),
+    ]
+)
+def test_output_handler_invalid_line_format(fwd_format, line_format):
+    """Tests that invalid line formats are reported as config errors."""
+
+    log_message_config = zhmc_log_forwarder.LogMessageConfig()
+    fwd_parms = dict(FWD_PARMS, format=fwd_format, line_format=line_format)
+
+    with pytest.raises(zhmc_log_forwarder.UserError):
+
+        zhmc_log_forwarder.OutputHandler(
+            CONFIG_PARMS, log_message_config, fwd_parms)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""Unit tests for time functions in zhmc_log_forwarder"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from zhmc_log_forwarder import zhmc_log_forwarder
+
+
+TESTCASES_DATETIME_FROM_HMC_TIME = [
+    #
+    # desc (str): Testcase description
+    # hmc_time (int): HMC time stamp to be converted.
+    # exp_utc (datetime): Expected datetime, as UTC.
+    (
+        "Epoch",
+        0,
+        datetime(1970, 1, 1, tzinfo=timezone.utc)
+    ),
+    (
+        "Time stamp with milliseconds",
+        1565347598550,
+        datetime(2019, 8, 9, 10, 46, 38, 550000, tzinfo=timezone.utc)
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, hmc_time, exp_utc", TESTCASES_DATETIME_FROM_HMC_TIME
+)
+def test_datetime_from_hmc_time(desc, hmc_time, exp_utc):
+    # pylint: disable=unused-argument
+    """Tests that HMC time stamps are converted to local datetime objects."""
+
+    dt = zhmc_log_forwarder.datetime_from_hmc_time(hmc_time)
+
+    assert dt.tzinfo is not None
+    assert dt == exp_utc
+
+    # The result is cached
+    dt2 = zhmc_log_forwarder.datetime_from_hmc_time(hmc_time)
+    assert dt2 is dt
+
+
+def test_local_timezone():
+    """Tests that the local timezone is determined once."""
+
+    tz1 = zhmc_log_forwarder.local_timezone()
+    tz2 = zhmc_log_forwarder.local_timezone()
+
+    assert tz1 is tz2
+    assert datetime(2019, 8, 9, tzinfo=tz1).utcoffset() is not None
+
+
+TESTCASES_PARSE_SINCE_TIME = [
+    #
+    # desc (str): Testcase description
+    # since (str): Value of the 'since' config parameter.
+    # exp_utc (datetime): Expected datetime, as UTC, if success. None for
+    #   local time.
+    # exp_exc (exc class): Expected exception class, if failure.
+    (
+        "ISO 8601 value with timezone",
+        "2019-08-09T12:46:38+02:00",
+        datetime(2019, 8, 9, 10, 46, 38, tzinfo=timezone.utc),
+        None
+    ),
+    (
+        "ISO 8601 value without timezone",
+        "2019-08-09 12:46:38",
+        None,
+        None
+    ),
+    (
+        "Value that needs the dateutil parser",
+        "Aug 9 2019 12:46:38 UTC",
+        datetime(2019, 8, 9, 12, 46, 38, tzinfo=timezone.utc),
+        None
+    ),
+    (
+        "Invalid value",
+        "foo",
+        None,
+        zhmc_log_forwarder.UserError
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, since, exp_utc, exp_exc", TESTCASES_PARSE_SINCE_TIME
+)
+def test_parse_since_time(desc, since, exp_utc, exp_exc):
+    # pylint: disable=unused-argument
+    """Tests that 'since' values are parsed into aware datetime objects."""
+
+    if exp_exc:
+        with pytest.raises(exp_exc):
+
+            zhmc_log_forwarder.parse_since_time(since)
+
+    else:
+
+        dt = zhmc_log_forwarder.parse_since_time(since)
+
+        assert dt.tzinfo is not None
+        if exp_utc is None:
+            assert dt.tzinfo is zhmc_log_forwarder.local_timezone()
+        else:
+            assert dt == exp_utc
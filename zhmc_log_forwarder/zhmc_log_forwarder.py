@@ -19,10 +19,12 @@ A log forwarder for the IBM Z HMC.
 
 import sys
 import os
+import stat
+import mmap
 import argparse
 from datetime import datetime
 import time
-from collections import OrderedDict
+from collections import namedtuple, OrderedDict
 import textwrap
 import logging
 from logging.handlers import SysLogHandler
@@ -30,15 +32,17 @@ from logging import StreamHandler
 import socket
 import uuid
 import json
-import jsonschema
-
-import attr
-import yaml
-import urllib3
-from dateutil import parser as dateutil_parser
-from dateutil import tz as dateutil_tz
-import stomp
-import zhmcclient
+import heapq
+import functools
+import itertools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import operator
+import re
+import string
+
+# The jsonschema, yaml, urllib3, dateutil, stomp and zhmcclient packages are
+# imported in the functions that use them, so that the help and version
+# options of the command do not pay the time for importing them.
 
 from .version import __version__
 
@@ -61,6 +65,32 @@ DEBUG_CADF_INCLUDE_FULL_RECORD = False
 # Debug flag: Output only unknown HMC log messages in CADF output
 DEBUG_CADF_ONLY_UNKNOWN = False
 
+# Maximum number of output lines that are written to stdout or stderr at once
+OUTPUT_CHUNK_LINES = 1000
+
+# Maximum number of most recently output log entries that are remembered for
+# skipping duplicate log entries
+OUTPUT_DEDUP_CACHE_SIZE = 4096
+
+# Minimum size in bytes of YAML files that are memory-mapped for loading
+YAML_MMAP_MIN_SIZE = 64 * 1024
+
+# Fields that can be used in the 'line_format' config parameter, for the
+# 'line' and 'cadf' output formats
+LINE_FORMAT_FIELDS = ('time', 'label', 'log', 'name', 'id', 'user', 'msg',
+                      'var_values', 'var_types')
+CADF_FORMAT_FIELDS = ('time', 'label', 'cadf')
+
+# Field name in a format string (an identifier, or a position that may be
+# empty), with its optional attribute and item parts
+FORMAT_FIELD_PATTERN = re.compile(
+    r'^([A-Za-z_]\w*|\d*)((?:\.[A-Za-z_]\w*|\[[^\[\]]+\])*)$')
+FORMAT_FIELD_PART_PATTERN = re.compile(
+    r'\.([A-Za-z_]\w*)|\[([^\[\]]+)\]')
+
+# Conversions that can be used for a field in a format string
+FORMAT_CONVERSIONS = ('r', 's', 'a')
+
 
 try:
     textwrap.indent
@@ -657,6 +687,54 @@ LOG_MESSAGE_FILE_SCHEMA = {
 }
 
 
+def load_yaml_file(filepath):
+    """
+    Load a YAML file and return the loaded data.
+
+    Regular files of at least YAML_MMAP_MIN_SIZE bytes are memory-mapped, so
+    that the YAML loader reads the file content directly from the mapped
+    pages instead of through Python file buffers. Smaller files are loaded
+    from the file object, because setting up the mapping would cost more
+    than it saves. This also keeps the file path in the position information
+    of YAML errors for these files.
+
+    Parameters:
+
+      filepath (string): File path of the YAML file.
+
+    Returns:
+
+      The loaded data, or None for an empty file.
+
+    Raises:
+
+      OSError: The file cannot be opened or mapped.
+      yaml.YAMLError: The file is not valid YAML.
+    """
+    # pylint: disable=import-outside-toplevel
+    import yaml
+
+    # Use the libyaml based YAML loader if PyYAML was built with it. The
+    # loader is imported as SafeLoader in both cases, so that bandit
+    # recognizes the yaml.load() calls as safe.
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
+
+    with open(filepath, 'rb') as fp:
+        st = os.fstat(fp.fileno())
+        if not stat.S_ISREG(st.st_mode) or st.st_size < YAML_MMAP_MIN_SIZE:
+            # Pipes and the like cannot be mapped, and small files are not
+            # worth mapping
+            return yaml.load(fp, Loader=SafeLoader)
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, 'madvise'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            return yaml.load(mm, Loader=SafeLoader)
+
+
+@functools.lru_cache(maxsize=None)
 def extend_with_default(validator_class):
     """
     Factory function that returns a new JSON schema validator class that
@@ -664,6 +742,9 @@ def extend_with_default(validator_class):
     that is being validated, by adding the schema-defined default values for
     any omitted properties.
 
+    The returned class is cached, so that it is created only once for each
+    validator class, and not for each file that is validated.
+
     Courtesy: https://python-jsonschema.readthedocs.io/en/stable/faq/
 
     Parameters:
@@ -676,6 +757,8 @@ def extend_with_default(validator_class):
       jsonschema.IValidator: JSON schema validator class that has been
         extended.
     """
+    import jsonschema  # pylint: disable=import-outside-toplevel
+
     validate_properties = validator_class.VALIDATORS["properties"]
 
     def set_defaults(validator, properties, instance, schema):
@@ -732,15 +815,17 @@ class Config:
         """
 
         # Load config file
+        import yaml  # pylint: disable=import-outside-toplevel
+
         try:
-            # pylint: disable=unspecified-encoding
-            with open(filepath) as fp:
-                self._parms = yaml.safe_load(fp)
-        except OSError as exc:
+            self._parms = load_yaml_file(filepath)
+        except (OSError, yaml.YAMLError) as exc:
             raise UserError(
                 "Cannot load config file {}: {}".
                 format(filepath, exc))
 
+        import jsonschema  # pylint: disable=import-outside-toplevel
+
         # Use a validator that adds defaults for omitted parameters
         ValidatorWithDefaults = extend_with_default(jsonschema.Draft7Validator)
         validator = ValidatorWithDefaults(self._schema)
@@ -779,6 +864,10 @@ class LogMessage:
     the log message.
     """
 
+    # The attributes are read for each CADF log record that is output
+    __slots__ = ('number', 'message', 'action', 'outcome', 'target_type',
+                 'target_class', 'initiator_address_item')
+
     def __init__(self, number, message, action, outcome, target_type,
                  target_class, initiator_address_item):
 
@@ -853,15 +942,17 @@ class LogMessageConfig(dict):
         """
 
         # Load HMC log message file
+        import yaml  # pylint: disable=import-outside-toplevel
+
         try:
-            # pylint: disable=unspecified-encoding
-            with open(filepath) as fp:
-                self._data = yaml.safe_load(fp)
-        except OSError as exc:
+            self._data = load_yaml_file(filepath)
+        except (OSError, yaml.YAMLError) as exc:
             raise UserError(
                 "Cannot load HMC log message file {}: {}".
                 format(filepath, exc))
 
+        import jsonschema  # pylint: disable=import-outside-toplevel
+
         # Use a validator that adds defaults for omitted parameters
         ValidatorWithDefaults = extend_with_default(jsonschema.Draft7Validator)
         validator = ValidatorWithDefaults(self._schema)
@@ -1400,41 +1491,178 @@ def parse_args():
     return args
 
 
-@attr.attrs
-class LogEntry:
-    # pylint: disable=too-few-public-methods
+# Definition of the data maintained for a log entry. This data is independent
+# of output formatting.
+# One named tuple is created for each log entry that is output.
+LogEntry = namedtuple('LogEntry', [
+    'time',  # Time stamp as datetime object
+    'label',  # HMC label
+    'log',  # HMC log (security, audit)
+    'name',  # Name of the log entry
+    'id',  # ID of the log entry
+    'user_name',  # Name of HMC userid for log entry
+    'user_id',  # Object-ID of HMC userid for log entry
+    'msg',  # Formatted message
+    'var_values',  # List of subst.var values in message
+    'var_types',  # List of subst.var types in message
+    'full_record',  # Dict with full HMC log record
+])
+
+
+@functools.lru_cache(maxsize=None)
+def local_timezone():
     """
-    Definition of the data maintained for a log entry. This data is independent
-    of output formatting.
+    Return the local timezone of the system, as a dateutil.tz.tzlocal object.
+
+    The result is cached, because the local timezone is determined from the
+    system configuration and does not change during the lifetime of the
+    process.
     """
-    time = attr.attrib(type=datetime)  # Time stamp as datetime object
-    label = attr.attrib(type=str)  # HMC label
-    log = attr.attrib(type=str)  # HMC log (security, audit)
-    name = attr.attrib(type=str)  # Name of the log entry
-    id = attr.attrib(type=int)  # ID of the log entry
-    user_name = attr.attrib(type=str)  # Name of HMC userid for log entry
-    user_id = attr.attrib(type=str)  # Object-ID of HMC userid for log entry
-    msg = attr.attrib(type=str)  # Formatted message
-    var_values = attr.attrib(type=list)  # List of subst.var values in message
-    var_types = attr.attrib(type=list)  # List of subst.var types in message
-    full_record = attr.attrib(type=dict)  # Dict with full HMC log record
-
-
-def formatted_time(dt, time_format):
+    # pylint: disable=import-outside-toplevel
+    from dateutil import tz as dateutil_tz
+
+    return dateutil_tz.tzlocal()
+
+
+@functools.lru_cache(maxsize=4096)
+def datetime_from_hmc_time(hmc_time):
     """
-    Return a string that is the formatted input time `dt`, using the
-    time format specified in the 'time_format' field.
+    Return a timezone-aware datetime object in the local timezone for an HMC
+    time stamp (number of milliseconds since the epoch).
+
+    The results are cached, because log entries that are created together
+    often have the same HMC time stamp. The returned datetime objects are
+    immutable, so they can be shared.
+    """
+    import zhmcclient  # pylint: disable=import-outside-toplevel
+
+    return zhmcclient.datetime_from_timestamp(hmc_time, local_timezone())
+
+
+def time_formatter(time_format):
+    """
+    Return a function that formats an input time `dt` into a string, using
+    the time format specified in the 'time_format' field.
+
+    The time format is resolved once, so that the returned function can be
+    used for many input times.
     """
     if time_format == 'iso8601':
-        return dt.isoformat()
+        return datetime.isoformat
     if time_format == 'iso8601b':
-        return dt.isoformat(' ')
+        return lambda dt: dt.isoformat(' ')
     if time_format == 'syslog':
         time_format = '%b %d %H:%M:%S'
-    return dt.strftime(time_format)  # already checked in __init__()
+    return lambda dt: dt.strftime(time_format)
+
+
+def format_field_names(format_str):
+    """
+    Return the names of the fields used in a Python new-style format string,
+    including fields that are nested in format specs.
+
+    For compound field names such as 'var_values[0]', only the name before
+    any attribute or item access is returned, like str.format() looks it up.
+
+    Parameters:
+
+      format_str (string): The format string.
+
+    Returns:
+
+      list of string: The field names, in the order of their occurrence.
+        Positional fields are returned as their position (e.g. '0'), or as
+        the empty string if automatically numbered.
+
+    Raises:
+
+      ValueError: The format string is invalid, including malformed field
+        names or attribute or item parts, and unknown conversions.
+    """
+    names = []
+    for _, field_name, format_spec, conversion in \
+            string.Formatter().parse(format_str):
+        if field_name is not None:
+            m = FORMAT_FIELD_PATTERN.match(field_name)
+            if not m:
+                raise ValueError(f"Malformed field {field_name!r}")
+            if conversion is not None and \
+                    conversion not in FORMAT_CONVERSIONS:
+                raise ValueError(
+                    f"Unknown conversion specifier {conversion!r} in field "
+                    f"{field_name!r}")
+            names.append(m.group(1))
+        if format_spec:
+            names.extend(format_field_names(format_spec))
+    return names
+
+
+def compile_format(format_str, field_names):
+    """
+    Compile a Python new-style format string into a function that returns the
+    same result as `format_str.format()` for its keyword arguments.
+
+    The function is generated as an f-string expression, so the format string
+    is parsed only once instead of each time a log record is formatted.
+
+    Parameters:
+
+      format_str (string): The format string.
+
+      field_names (tuple of string): The names of the fields that can be used
+        in the format string. All of them must be passed as keyword arguments
+        when calling the returned function.
+
+    Returns:
+
+      callable: Function that returns the formatted string. If the format
+        string cannot be compiled (e.g. because it is invalid, uses unknown or
+        positional fields, or uses nested replacement fields), the format()
+        method of the format string is returned, so that any errors surface
+        the same way as before.
+    """
+    fallback = format_str.format
+    try:
+        parsed = list(string.Formatter().parse(format_str))
+    except ValueError:
+        return fallback
+    parts = []
+    item_keys = []  # Item keys are passed in, to avoid quoting issues
+    for literal, field_name, format_spec, conversion in parsed:
+        parts.append(literal.replace('{', '{{').replace('}', '}}'))
+        if field_name is None:
+            continue
+        m = FORMAT_FIELD_PATTERN.match(field_name)
+        if not m or m.group(1) not in field_names:
+            return fallback
+        expr = m.group(1)
+        for attr_name, key in FORMAT_FIELD_PART_PATTERN.findall(m.group(2)):
+            if attr_name:
+                expr += f'.{attr_name}'
+            else:
+                expr += f'[_keys[{len(item_keys)}]]'
+                item_keys.append(int(key) if key.isdecimal() else key)
+        if not format_spec.isprintable() or \
+                any(c in format_spec for c in '{}\'"\\'):
+            return fallback
+        field = '{' + expr
+        if conversion:
+            field += '!' + conversion
+        if format_spec:
+            field += ':' + format_spec
+        parts.append(field + '}')
+    source = 'lambda {}: f{!r}'.format(', '.join(field_names), ''.join(parts))
+    try:
+        # The source is built only from validated field names and from
+        # literal text that is quoted using repr().
+        # pylint: disable=eval-used
+        return eval(source, {'_keys': tuple(item_keys)})  # nosec B307
+    except SyntaxError:
+        return fallback
 
 
 class OutputHandler:
+    # pylint: disable=too-many-instance-attributes
     """
     Handle the outputting of log records for a single log forwarding.
     """
@@ -1457,7 +1685,7 @@ class OutputHandler:
         self.fwd_parms = fwd_parms
 
         props = CONFIG_FILE_SCHEMA['properties']['check_data']['properties']
-        data = self.config_parms.get('check_data', OrderedDict())
+        data = self.config_parms.get('check_data', {})
         if 'imgmt_subnet' not in data:
             data['imgmt_subnet'] = props['imgmt_subnet']['default']
         if 'functional_users' not in data:
@@ -1478,29 +1706,99 @@ class OutputHandler:
         self.syslog_facility = None
         self.syslog_porttype = None
 
-        fwd_format = self.fwd_parms['format']
+        # Forwarding parameters that are used for each log record. They are
+        # constant for the lifetime of the handler. The log types are a
+        # frozenset, for the membership check for each log record.
+        self.logs = frozenset(self.fwd_parms['logs'])
+        self.fwd_format = self.fwd_parms['format']
+        self.line_format = self.fwd_parms['line_format']
+        self.time_format = self.fwd_parms['time_format']
+
+        # Line formats that pass through a single field unchanged, for which
+        # the formatting (including the time formatting) can be bypassed.
+        self.line_format_is_msg = self.line_format == '{msg}'
+        self.line_format_is_cadf = self.line_format == '{cadf}'
+
+        if self.fwd_format == 'cadf':
+            format_fields = CADF_FORMAT_FIELDS
+        else:
+            format_fields = LINE_FORMAT_FIELDS
 
-        if fwd_format == 'line':
-            # Check validity of the line_format string:
-            line_format = self.fwd_parms['line_format']
-            try:
-                line_format.format(
-                    time='test', label='test', log='test', name='test',
-                    id='test', user='test', msg='test', var_values='test',
-                    var_types='test')
-            except KeyError as exc:
-                # KeyError is raised when the format string contains a named
-                # placeholder that is not provided in format().
+        # Check validity of the line_format string:
+        try:
+            field_names = format_field_names(self.line_format)
+        except ValueError as exc:
+            raise UserError(
+                "Config parameter 'line_format' in forwarding '{name}' "
+                "is an invalid format string: {msg}".
+                format(name=self.fwd_parms['name'], msg=str(exc)))
+        for field_name in field_names:
+            if field_name not in format_fields:
                 raise UserError(
                     "Config parameter 'line_format' in forwarding '{name}' "
-                    "specifies an invalid field: {msg}".
-                    format(name=self.fwd_parms['name'], msg=str(exc)))
+                    "specifies an invalid field: {field!r}".
+                    format(name=self.fwd_parms['name'], field=field_name))
+
+        # Compiled line format, to avoid parsing it for each log record
+        self.format_line = compile_format(self.line_format, format_fields)
+
+        # Table header and trailer for the 'line' output format to stdout or
+        # stderr. They are constant and are prepared once.
+        if self.fwd_format == 'line' and \
+                self.fwd_parms['dest'] in ('stdout', 'stderr'):
+            separator = "-" * 120
+            self.header_str = self.line_format.format(
+                time='Time', label=self.label_hdr, log='Log', name='Name',
+                id='ID', user='Userid', msg='Message',
+                var_values='Variables',
+                var_types='Variable types') + '\n' + separator + '\n'
+            self.trailer_str = separator + '\n'
+        else:
+            self.header_str = None
+            self.trailer_str = None
+
+        # Method for producing the output string for a row. It is selected
+        # once for the output format, instead of for each log record.
+        if self.fwd_format == 'cadf':
+            assert isinstance(self.log_message_config, LogMessageConfig)
+            self.out_str = self._out_str_cadf
+            # JSON encoding function for CADF records, created once instead
+            # of checking the json.dumps() arguments for each log record
+            self.cadf_encode = json.JSONEncoder(indent=CADF_JSON_INDENT).encode
+        else:
+            self.out_str = self._out_str_line
+
+        # Keys of the most recently output log entries, for skipping log
+        # entries that have already been output by earlier calls of
+        # output_entries() (e.g. when a notification overlaps with the log
+        # entries retrieved before). Log entries with the same key within one
+        # call are separate HMC events and are all output. Used as an ordered
+        # set that is bounded to OUTPUT_DEDUP_CACHE_SIZE keys, by removing
+        # the oldest keys. The event ID is not unique (it is the HMC log
+        # message number), so the key includes the log type, time and
+        # message text.
+        self.output_keys = OrderedDict()
+
+        # Message info used for HMC log messages that are not in the HMC log
+        # message file.
+        self.unknown_msg_info = LogMessage(
+            number=None,
+            message=None,
+            action='unknown',
+            outcome='unknown',
+            target_type=None,
+            target_class=None,
+            initiator_address_item=None,
+        )
+
+        # Function for formatting the time of a log record, to avoid
+        # resolving the time_format parameter for each log record.
+        self.format_time = time_formatter(self.time_format)
 
         # Check validity of the time_format string:
         dt = datetime.now()
-        time_format = self.fwd_parms['time_format']
         try:
-            formatted_time(dt, time_format)
+            self.format_time(dt)
         except UnicodeError as exc:
             raise UserError(
                 "Config parameter 'time_format' is invalid: {}".
@@ -1515,18 +1813,10 @@ class OutputHandler:
         resources such as Python loggers (e.g. when writing to syslog).
         """
         dest = self.fwd_parms['dest']
-        fwd_format = self.fwd_parms['format']
-        line_format = self.fwd_parms['line_format']
         if dest in ('stdout', 'stderr'):
-            if fwd_format == 'line':
+            if self.fwd_format == 'line':
                 dest_stream = getattr(sys, dest)
-                out_str = line_format.format(
-                    time='Time', label=self.label_hdr, log='Log', name='Name',
-                    id='ID', user='Userid', msg='Message',
-                    var_values='Variables',
-                    var_types='Variable types')
-                print(out_str, file=dest_stream)
-                print("-" * 120, file=dest_stream)
+                dest_stream.write(self.header_str)
                 dest_stream.flush()
         else:
             assert dest == 'syslog'
@@ -1561,11 +1851,10 @@ class OutputHandler:
         as Python loggers (e.g. when writing to syslog).
         """
         dest = self.fwd_parms['dest']
-        fwd_format = self.fwd_parms['format']
         if dest in ('stdout', 'stderr'):
-            if fwd_format == 'line':
+            if self.fwd_format == 'line':
                 dest_stream = getattr(sys, dest)
-                print("-" * 120, file=dest_stream)
+                dest_stream.write(self.trailer_str)
                 dest_stream.flush()
         else:
             assert dest == 'syslog'
@@ -1576,67 +1865,39 @@ class OutputHandler:
         Called for outputting a set of log records.
         Can be called multiple times.
         """
-        table = []
-        for le in log_entries:
-            le_log = le['log-type']
-            if le_log not in self.fwd_parms['logs']:
-                continue
-            hmc_time = le['event-time']
-            le_time = zhmcclient.datetime_from_timestamp(
-                hmc_time, dateutil_tz.tzlocal())
-            le_name = le['event-name']
-            le_id = le['event-id']
-            le_user_name = le['userid'] or ''
-            le_user_id = le['user-uri'] or ''
-            le_msg = le['event-message']
+        import zhmcclient  # pylint: disable=import-outside-toplevel
 
-            # Convert the data items into two index-correlated lists, for
-            # value and type. The logic tolerates missing and unsorted
-            # item numbers.
-            le_var_values = []
-            le_var_types = []
-            data_items = le['event-data-items']
-            if data_items:
-                data_items = sorted(data_items,
-                                    key=lambda i: i['data-item-number'])
-                max_item_number = data_items[-1]['data-item-number']
-                di = 0
-                for i in range(0, max_item_number + 1):
-                    data_item = data_items[di]
-                    if i == data_item['data-item-number']:
-                        le_var_values.append(data_item['data-item-value'])
-                        le_var_types.append(data_item['data-item-type'])
-                        di += 1
-                    else:
-                        # Item at this index is missing. This has not been
-                        # observed in any actual log messages so far.
-                        le_var_values.append(None)
-                        le_var_types.append(None)
-
-            row = LogEntry(
-                time=le_time, label=self.label, log=le_log, name=le_name,
-                id=le_id, user_name=le_user_name, user_id=le_user_id,
-                msg=le_msg, var_values=le_var_values, var_types=le_var_types,
-                full_record=le)
-            table.append(row)
-
-        sorted_table = sorted(table, key=lambda row: row.time)
+        assert isinstance(console, zhmcclient.Console)
 
+        # The rows are produced lazily while outputting them, so that no list
+        # of all rows is built.
+        rows = self._rows(log_entries)
+
+        # Bind the methods used in the loops to local variables, to avoid the
+        # attribute lookups for each log record.
+        get_out_str = self.out_str
         dest = self.fwd_parms['dest']
         if dest in ('stdout', 'stderr'):
             dest_stream = getattr(sys, dest)
-            for row in sorted_table:
-                out_str = self.out_str(row, console)
-                if out_str:
-                    print(out_str, file=dest_stream)
-                    dest_stream.flush()
+            # The output lines are produced lazily and written to the stream
+            # in chunks, instead of writing and flushing each line. This
+            # bounds the memory for the output lines, and the first lines
+            # are written before all lines have been formatted.
+            out_strs = (out_str for row in rows
+                        if (out_str := get_out_str(row, console)))
+            while lines := list(itertools.islice(
+                    out_strs, OUTPUT_CHUNK_LINES)):
+                lines.append('')  # for the trailing newline
+                dest_stream.write('\n'.join(lines))
+                dest_stream.flush()
         else:
             assert dest == 'syslog'
-            for row in sorted_table:
-                out_str = self.out_str(row, console)
+            log_info = self.logger.info
+            for row in rows:
+                out_str = get_out_str(row, console)
                 if out_str:
                     try:
-                        self.logger.info(out_str)
+                        log_info(out_str)
                     except Exception as exc:
                         raise ConnectionError(
                             "Cannot write log entry to syslog server at "
@@ -1644,109 +1905,187 @@ class OutputHandler:
                             format(host=self.syslog_host, port=self.syslog_port,
                                    porttype=self.syslog_porttype, msg=str(exc)))
 
-    def out_str(self, row, console):
+    def _rows(self, log_entries):
         """
-        Return an output string for the specified row that fits the specified
-        output format.
+        Generator that yields the rows (as LogEntry objects) for the specified
+        HMC log entries, ordered by time.
 
-        If the row is not to be output, None is returned.
+        Log entries for logs that are not forwarded and log entries that have
+        already been output are skipped.
         """
-        fwd_format = self.fwd_parms['format']
-        time_format = self.fwd_parms['time_format']
-        if fwd_format == 'line':
-            line_format = self.fwd_parms['line_format']
-            out_str = line_format.format(
-                time=formatted_time(row.time, time_format),
-                label=row.label,
-                log=row.log, name=row.name, id=row.id, user=row.user_name,
-                msg=row.msg, var_values=row.var_values,
-                var_types=row.var_types)
-        else:
-            assert fwd_format == 'cadf'
-            assert isinstance(self.log_message_config, LogMessageConfig)
-            assert isinstance(console, zhmcclient.Console)
-            try:
-                msg_info = self.log_message_config.messages[row.id]
-            except KeyError:
-                msg_info = LogMessage(
-                    number=None,
-                    message=None,
-                    action='unknown',
-                    outcome='unknown',
-                    target_type=None,
-                    target_class=None,
-                    initiator_address_item=None,
-                )
-            if DEBUG_CADF_ONLY_UNKNOWN and msg_info.action != 'unknown':
-                return None
-            msg_id = str(uuid.uuid4())
-            out_dict = OrderedDict([
-                ("id", f"zhmc_log_forwarder:{msg_id}"),
-                ("typeURI", "https://schemas.dmtf.org/cloud/audit/1.0/event"),
-                ("eventTime", formatted_time(row.time, 'iso8601')),
-                ("eventType", "activity"),
-                ("action", msg_info.action),
-                ("x_eventCategory", "activity/" + msg_info.action),
-                ("x_eventType", "zhmc" + row.id),
-                ("outcome", msg_info.outcome),
-                ("observer", OrderedDict([
-                    ("id", f"hmc:{console.uri}"),
-                    ("typeURI", "service"),
-                    ("name", console.name),
-                    ("x_label", row.label),
-                ])),
-                ("x_message", OrderedDict([
-                    ("number", row.id),
-                    ("log", row.log),
-                    ("text", row.msg),
-                    ("var_values", row.var_values),
-                    ("var_types", row.var_types),
-                ])),
-                ("x_check_data", self.check_data),
-            ])
-            if row.user_name or CADF_ALWAYS_INCLUDE_OPTIONAL_ITEMS:
-                initiator = OrderedDict([
-                    ("id", f"hmc:{row.user_id}"),
-                    ("typeURI", "data/security/account/user"),
-                    ("name", row.user_name),
-                ])
-                # Try to find out initiator IP address
-                ix = msg_info.initiator_address_item
-                if ix is None:
-                    initiator_address = "unknown"
-                else:
-                    initiator_address = row.var_values[ix]
+
+        # Getters for the fields of log entries and data items, to get them in
+        # a single call
+        entry_fields = operator.itemgetter(
+            'event-time', 'event-name', 'event-id', 'userid', 'user-uri',
+            'event-message', 'event-data-items')
+        entry_key = operator.itemgetter(
+            'log-type', 'event-time', 'event-id', 'event-message')
+        data_item_number = operator.itemgetter('data-item-number')
+        data_item_fields = operator.itemgetter(
+            'data-item-number', 'data-item-value', 'data-item-type')
+
+        # The log entries are normally already ordered by time (see
+        # get_log_entries()), in which case sorting them is a single linear
+        # pass. The sort is still done because the order of the log entries
+        # in notifications is not guaranteed. The log entries are sorted by
+        # their HMC time stamp, which is an integer that compares faster than
+        # the converted datetime objects.
+        log_entries = sorted(
+            log_entries, key=operator.itemgetter('event-time'))
+
+        logs = self.logs
+        label = self.label
+        output_keys = self.output_keys
+        batch_keys = []  # Keys of this call, remembered after the loop
+        for le in log_entries:
+            le_log = le['log-type']
+            if le_log not in logs:
+                continue
+            if DEBUG_CADF_ONLY_UNKNOWN and self.fwd_format == 'cadf' and \
+                    self.log_message_config.messages.get(
+                        le['event-id'], self.unknown_msg_info).action != \
+                    'unknown':
+                # Skip HMC log messages with a known action before doing any
+                # work on them
+                continue
+            key = entry_key(le)
+            if key in output_keys:
+                # Skip log entries that have been output by earlier calls
+                continue
+            batch_keys.append(key)
+            (hmc_time, le_name, le_id, le_user_name, le_user_id, le_msg,
+             data_items) = entry_fields(le)
+            le_time = datetime_from_hmc_time(hmc_time)
+            le_user_name = le_user_name or ''
+            le_user_id = le_user_id or ''
+
+            # Convert the data items into two index-correlated lists, for
+            # value and type. The lists are allocated with their final size
+            # and the items are stored at their item number, so unsorted
+            # item numbers need no sorting. Missing item numbers remain None,
+            # although this has not been observed in any actual log messages
+            # so far.
+            if data_items:
+                num_items = max(map(data_item_number, data_items)) + 1
+                le_var_values = [None] * num_items
+                le_var_types = [None] * num_items
+                for i, value, type_ in map(data_item_fields, data_items):
+                    le_var_values[i] = value
+                    le_var_types[i] = type_
+            else:
+                le_var_values = []
+                le_var_types = []
+
+            # Positional arguments, in the order of the LogEntry fields
+            yield LogEntry(
+                le_time, label, le_log, le_name, le_id, le_user_name,
+                le_user_id, le_msg, le_var_values, le_var_types, le)
+
+        for key in batch_keys:
+            output_keys[key] = None
+        while len(output_keys) > OUTPUT_DEDUP_CACHE_SIZE:
+            output_keys.popitem(last=False)
+
+    def _out_str_line(self, row, console):
+        # pylint: disable=unused-argument
+        """
+        Return an output string for the specified row in the 'line' output
+        format.
+        """
+        if self.line_format_is_msg:
+            return row.msg
+        out_str = self.format_line(
+            time=self.format_time(row.time),
+            label=row.label,
+            log=row.log, name=row.name, id=row.id, user=row.user_name,
+            msg=row.msg, var_values=row.var_values,
+            var_types=row.var_types)
+        return out_str
+
+    def _out_str_cadf(self, row, console):
+        """
+        Return an output string for the specified row in the 'cadf' output
+        format.
+        """
+        msg_info = self.log_message_config.messages.get(
+            row.id, self.unknown_msg_info)
+        msg_id = str(uuid.uuid4())
+        event_time = row.time.isoformat()
+        out_dict = {
+            "id": f"zhmc_log_forwarder:{msg_id}",
+            "typeURI": "https://schemas.dmtf.org/cloud/audit/1.0/event",
+            "eventTime": event_time,
+            "eventType": "activity",
+            "action": msg_info.action,
+            "x_eventCategory": "activity/" + msg_info.action,
+            "x_eventType": "zhmc" + row.id,
+            "outcome": msg_info.outcome,
+            "observer": {
+                "id": f"hmc:{console.uri}",
+                "typeURI": "service",
+                "name": console.name,
+                "x_label": row.label,
+            },
+            "x_message": {
+                "number": row.id,
+                "log": row.log,
+                "text": row.msg,
+                "var_values": row.var_values,
+                "var_types": row.var_types,
+            },
+            "x_check_data": self.check_data,
+        }
+        if row.user_name or CADF_ALWAYS_INCLUDE_OPTIONAL_ITEMS:
+            initiator = {
+                "id": f"hmc:{row.user_id}",
+                "typeURI": "data/security/account/user",
+                "name": row.user_name,
+            }
+            # Try to find out initiator IP address
+            ix = msg_info.initiator_address_item
+            if ix is None:
+                initiator_address = "unknown"
+            else:
+                initiator_address = row.var_values[ix]
+                # "console" takes precedence if both words are present
                 if "console" in initiator_address:
                     # e.g. "the console"
                     initiator_address = "console"
-                if "unknown" in initiator_address:
+                elif "unknown" in initiator_address:
                     # e.g. "an unknown location"
                     initiator_address = "unknown"
-                initiator["address"] = initiator_address
-                out_dict["initiator"] = initiator
-            if msg_info.target_type or CADF_ALWAYS_INCLUDE_OPTIONAL_ITEMS:
-                if msg_info.target_class == 'console':
-                    resource_id = f"hmc:{console.uri}"
-                    resource_name = console.name
-                else:
-                    # TODO: Change id to use object-id of HMC target resource
-                    resource_id = "hmc:{TODO:resource.object-id}"
-                    # TODO: Change name to use name of HMC target resource
-                    resource_name = "{TODO:resource.name}"
-                out_dict["target"] = OrderedDict([
-                    ("id", resource_id),
-                    ("typeURI", msg_info.target_type),
-                    ("name", resource_name),
-                    ("x_class", msg_info.target_class),
-                ])
-            if DEBUG_CADF_INCLUDE_FULL_RECORD:
-                out_dict["x_full_record"] = row.full_record
-            cadf_str = json.dumps(out_dict, indent=CADF_JSON_INDENT)
-            line_format = self.fwd_parms['line_format']
-            out_str = line_format.format(
-                time=formatted_time(row.time, time_format),
-                label=row.label,
-                cadf=cadf_str)
+            initiator["address"] = initiator_address
+            out_dict["initiator"] = initiator
+        if msg_info.target_type or CADF_ALWAYS_INCLUDE_OPTIONAL_ITEMS:
+            if msg_info.target_class == 'console':
+                resource_id = f"hmc:{console.uri}"
+                resource_name = console.name
+            else:
+                # TODO: Change id to use object-id of HMC target resource
+                resource_id = "hmc:{TODO:resource.object-id}"
+                # TODO: Change name to use name of HMC target resource
+                resource_name = "{TODO:resource.name}"
+            out_dict["target"] = {
+                "id": resource_id,
+                "typeURI": msg_info.target_type,
+                "name": resource_name,
+                "x_class": msg_info.target_class,
+            }
+        if DEBUG_CADF_INCLUDE_FULL_RECORD:
+            out_dict["x_full_record"] = row.full_record
+        cadf_str = self.cadf_encode(out_dict)
+        if self.line_format_is_cadf:
+            return cadf_str
+        if self.time_format == 'iso8601':
+            # Reuse the already formatted event time
+            time_str = event_time
+        else:
+            time_str = self.format_time(row.time)
+        out_str = self.format_line(
+            time=time_str,
+            label=row.label,
+            cadf=cadf_str)
         return out_str
 
 
@@ -1773,7 +2112,7 @@ class DatetimeFormatter(logging.Formatter):
             time_value += float(record.msecs) / 1000
         dt = datetime.fromtimestamp(time_value)
         if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=dateutil_tz.tzlocal())
+            dt = dt.replace(tzinfo=local_timezone())
         if datefmt:
             s = dt.strftime(datefmt)
         else:
@@ -1875,22 +2214,89 @@ def zhmcclient_log_setup(logger_name, dest, format_str, time_format, debug):
     logger.setLevel(log_level)
 
 
+def parse_since_time(since):
+    """
+    Return a timezone-aware datetime object for a date & time value of the
+    'since' config parameter. Values without timezone are in the local
+    timezone.
+
+    Raises:
+
+      UserError: Invalid date & time value.
+    """
+    try:
+        try:
+            # Fast path for ISO 8601 values, which avoids importing and
+            # running the general dateutil parser.
+            begin_time = datetime.fromisoformat(since)
+        except ValueError:
+            # pylint: disable=import-outside-toplevel
+            from dateutil import parser as dateutil_parser
+            # TODO: Pass tzinfos arg to get timezones parsed. Without that,
+            # only UTC is parsed, and anything else will lead to no tzinfo.
+            begin_time = dateutil_parser.parse(since)
+    except (ValueError, OverflowError):
+        raise UserError(
+            "Config parameter 'since' has an invalid date & time "
+            "value: {}".
+            format(since))
+    if begin_time.tzinfo is None:
+        begin_time = begin_time.replace(tzinfo=local_timezone())
+    return begin_time
+
+
 def get_log_entries(logs, console, begin_time, end_time):
     """
     Retrieve the desired types of log entries for a specified time range from
     the HMC.
+
+    The log entries are returned as a list that is ordered by time.
+
+    If both the audit log and the security log are requested, they are
+    retrieved concurrently, so that the two HMC requests overlap.
     """
-    log_entries = []
+
+    def get_log(log_type, log_func):
+        """
+        Retrieve the log entries of one log and tag them with the log type.
+        When running in a worker thread, the tagging overlaps with the
+        retrieval of the other log.
+        """
+        entries = log_func(begin_time, end_time)
+        for e in entries:
+            e['log-type'] = log_type
+        return entries
+
+    log_funcs = []
     if 'audit' in logs:
-        audit_entries = console.get_audit_log(begin_time, end_time)
-        for e in audit_entries:
-            e['log-type'] = 'audit'
-        log_entries += audit_entries
+        log_funcs.append(('audit', console.get_audit_log))
     if 'security' in logs:
-        security_entries = console.get_security_log(begin_time, end_time)
-        for e in security_entries:
-            e['log-type'] = 'security'
-        log_entries += security_entries
+        log_funcs.append(('security', console.get_security_log))
+    entries_by_log = {'audit': [], 'security': []}
+    if len(log_funcs) == 1:
+        log_type, log_func = log_funcs[0]
+        entries_by_log[log_type] = get_log(log_type, log_func)
+    elif log_funcs:
+        with ThreadPoolExecutor(max_workers=len(log_funcs)) as executor:
+            futures = {
+                executor.submit(get_log, log_type, log_func): log_type
+                for log_type, log_func in log_funcs}
+            for future in as_completed(futures):
+                entries_by_log[futures[future]] = future.result()
+    audit_entries = entries_by_log['audit']
+    security_entries = entries_by_log['security']
+    # If only one log type has entries, its list is returned as is, without
+    # merging.
+    if not security_entries:
+        return audit_entries
+    if not audit_entries:
+        return security_entries
+    # The HMC returns the entries of each log ordered by time, so they can be
+    # merged in linear time. The result is a list because it is used by
+    # multiple output handlers.
+    log_entries = list(heapq.merge(
+        audit_entries, security_entries,
+        key=operator.itemgetter('event-time')))
     return log_entries
 
 
@@ -1900,20 +2306,22 @@ def process_future(
     """
     Process future items
     """
+    # pylint: disable=import-outside-toplevel
+    import stomp
+    import zhmcclient
+
     topic_items = session.get_notification_topics()
-    security_topic_name = None
-    audit_topic_name = None
-    topic_names = []
+    # Log type by topic name, for the topics that are subscribed to
+    log_types = {}
     for topic_item in topic_items:
         topic_type = topic_item['topic-type']
         if topic_type == 'security-notification' \
                 and 'security' in all_logs:
-            security_topic_name = topic_item['topic-name']
-            topic_names.append(security_topic_name)
+            log_types[topic_item['topic-name']] = 'security'
         if topic_type == 'audit-notification' \
                 and 'audit' in all_logs:
-            audit_topic_name = topic_item['topic-name']
-            topic_names.append(audit_topic_name)
+            log_types[topic_item['topic-name']] = 'audit'
+    topic_names = list(log_types)
     if topic_names:
         try:
             receiver = zhmcclient.NotificationReceiver(
@@ -1933,16 +2341,11 @@ def process_future(
                     for headers, message in receiver.notifications():
                         if headers['notification-type'] == 'log-entry':
                             topic_name = headers['destination'].split('/')[-1]
-                            if topic_name == security_topic_name:
-                                log_entries = message['log-entries']
-                                for le in log_entries:
-                                    le['log-type'] = 'security'
-                                for hdlr in out_handlers:
-                                    hdlr.output_entries(log_entries, console)
-                            elif topic_name == audit_topic_name:
+                            log_type = log_types.get(topic_name)
+                            if log_type:
                                 log_entries = message['log-entries']
                                 for le in log_entries:
-                                    le['log-type'] = 'audit'
+                                    le['log-type'] = log_type
                                 for hdlr in out_handlers:
                                     hdlr.output_entries(log_entries, console)
                             else:
@@ -1987,6 +2390,14 @@ def main():
     Main routine of the program.
     """
 
+    # The command line arguments are parsed before importing the packages
+    # below, because the help and version options exit without using them.
+    args = parse_args()
+
+    # pylint: disable=import-outside-toplevel
+    import urllib3
+    import zhmcclient
+
     urllib3.disable_warnings()  # Used by zhmcclient
 
     # Initial self-logger, using defaults.
@@ -2000,8 +2411,6 @@ def main():
 
     try:  # transform any of our exceptions to an error exit
 
-        args = parse_args()
-
         config = Config()
         config.load_config_file(args.config_file)
 
@@ -2048,23 +2457,12 @@ def main():
             begin_time = None
             since_str = 'all'
         elif since == 'now':
-            begin_time = datetime.now(dateutil_tz.tzlocal())
+            begin_time = datetime.now(local_timezone())
             since_str = f'now ({begin_time})'
         else:
             assert since is not None
-            try:
-                begin_time = dateutil_parser.parse(since)
-                # TODO: Pass tzinfos arg to get timezones parsed. Without that,
-                # only UTC is parsed, and anything else will lead to no tzinfo.
-                if begin_time.tzinfo is None:
-                    begin_time = begin_time.replace(
-                        tzinfo=dateutil_tz.tzlocal())
-                since_str = f'{begin_time}'
-            except (ValueError, OverflowError):
-                raise UserError(
-                    "Config parameter 'since' has an invalid date & time "
-                    "value: {}".
-                    format(args.since))
+            begin_time = parse_since_time(since)
+            since_str = f'{begin_time}'
 
         self_logger.info(
             f"{CMD_NAME} starting")
@@ -2113,8 +2511,7 @@ def main():
             hdlr = OutputHandler(config.parms, log_message_config, fwd_parms)
             out_handlers.append(hdlr)
 
-            for log in logs:
-                all_logs.add(log)
+            all_logs.update(logs)
 
         self_logger.info(
             "Collecting these logs altogether: {logs}".
@@ -2127,6 +2524,10 @@ def main():
             client = zhmcclient.Client(session)
             console = client.consoles.console
 
+            # Log on before retrieving the logs, because that may happen in
+            # concurrent threads that would otherwise each log on.
+            session.logon()
+
             for hdlr in out_handlers:
                 hdlr.output_begin()
 